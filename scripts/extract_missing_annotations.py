@@ -1,4 +1,6 @@
-import ast
+import functools
+import itertools
+import json
 from collections import Counter
 
 import click
@@ -6,7 +8,11 @@ import pandas as pd
 from rdkit import RDLogger
 from rxn.chemutils.conversion import canonicalize_smiles
 
-RDLogger.DisableLog("rdApp.*")
+
+@functools.lru_cache(maxsize=None)
+def _canonicalize(smiles: str) -> str:
+    # The missing annotations are few molecules repeated many times
+    return canonicalize_smiles(smiles)
 
 
 @click.command()
@@ -21,34 +27,39 @@ def main(input_csv: str, output_csv: str, threshold_counts: int):
         'rxn_missing_annotations': for each line of the csv file a list of molecules requiring annotations
     The two columns are automatically generated with the standardization script
     """
+    RDLogger.DisableLog("rdApp.*")
+
     df = pd.read_csv(input_csv)
     print(df.head())
 
     print(f"Length of dataset before duplicates removal: {len(df)}")
     df.drop_duplicates(["original_atom_mapped_rxn"], inplace=True)
     print(f"Length of dataset after duplicates removal: {len(df)}")
-    # converting a "list string" to a list
-    df.rxn_missing_annotations = df.rxn_missing_annotations.apply(
-        lambda x: ast.literal_eval(x)
-    )
+    # converting a "list string" to a list. The lists were written with str(),
+    # i.e. with single quotes; as SMILES never contain quotes, swapping them for
+    # double quotes gives valid JSON, which is much faster to parse than with
+    # ast.literal_eval.
+    df.rxn_missing_annotations = [
+        json.loads(x)
+        for x in df.rxn_missing_annotations.str.replace("'", '"', regex=False)
+    ]
 
     # save a list of canonical missing annotations
     missing_annotations = []
     for elem in df.rxn_missing_annotations.values:
         if elem != []:
-            missing_annotations.extend([canonicalize_smiles(smi) for smi in elem])
+            missing_annotations.extend(map(_canonicalize, elem))
 
     c = Counter(missing_annotations)
     print(c.most_common(10))
     print(f"Number of missing annotations: {len(c)}")
 
-    catalysts = []
-    counts = []
-
-    for key, count in c.items():
-        if count >= threshold_counts:
-            catalysts.append(key)
-            counts.append(count)
+    # most_common() is sorted by decreasing count: stop at the threshold
+    above_threshold = list(
+        itertools.takewhile(lambda x: x[1] >= threshold_counts, c.most_common())
+    )
+    catalysts = [key for key, _ in above_threshold]
+    counts = [count for _, count in above_threshold]
     print(
         f"Number of missing annotations with count >={threshold_counts}: {len(catalysts)}"
     )
@@ -19,15 +19,16 @@ def main(
 ):
     df = pd.read_csv(input_file_path)
     df["original_atom_mapped_rxn"] = df[rxn_smiles_column]
-    if remove_atom_maps:
-        df[rxn_smiles_column] = df[rxn_smiles_column].apply(
-            lambda x: remove_atom_mapping(x)
-        )
-    df[rxn_smiles_column] = df[rxn_smiles_column].apply(
-        lambda x: parse_extended_reaction_smiles(x, remove_atom_maps=False).to_string(
-            fragment_bond
-        )
-    )
+
+    def clean(rxn_smiles: str) -> str:
+        # Atom maps always come with a ":"; no need to run the regex otherwise
+        if remove_atom_maps and ":" in rxn_smiles:
+            rxn_smiles = remove_atom_mapping(rxn_smiles)
+        return parse_extended_reaction_smiles(
+            rxn_smiles, remove_atom_maps=False
+        ).to_string(fragment_bond)
+
+    df[rxn_smiles_column] = df[rxn_smiles_column].map(clean)
 
     df.to_csv(output_file_path, index=False)
 
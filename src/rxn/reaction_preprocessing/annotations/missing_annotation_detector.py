@@ -95,18 +95,15 @@ class MissingAnnotationDetector:
             requires_annotation_fn: function with which to decide whether a molecule
                 needs an annotation. Defaults to AnnotationCriterion().
         """
-        original_smiles = {
-            annotation.original_without_fragment_bond
-            for annotation in molecule_annotations
-        }
-        # Also consider the updated SMILES, but only if they consist in exactly one molecule.
-        updated_smiles = {
-            annotation.updated_without_fragment_bond[0]
-            for annotation in molecule_annotations
-            if annotation.updated_smiles is not None
-            and len(annotation.updated_without_fragment_bond) == 1
-        }
+        annotated_molecules: Set[str] = set()
+        for annotation in molecule_annotations:
+            annotated_molecules.add(annotation.original_without_fragment_bond)
+            # Also consider the updated SMILES, but only if they consist in exactly one molecule.
+            if annotation.updated_smiles is not None:
+                updated_smiles = annotation.updated_without_fragment_bond
+                if len(updated_smiles) == 1:
+                    annotated_molecules.add(updated_smiles[0])
         return cls(
-            annotated_molecules=original_smiles | updated_smiles,
+            annotated_molecules=annotated_molecules,
             requires_annotation_fn=requires_annotation_fn,
         )
@@ -13,7 +13,7 @@ class AnnotationDecision(RxnEnum):
     REJECT = auto()
 
 
-@attr.s(auto_attribs=True, init=False)
+@attr.s(auto_attribs=True, init=False, slots=True)
 class MoleculeAnnotation:
     """
     Specifies a molecule annotation, i.e. a SMILES string that may have an
@@ -35,11 +35,12 @@ class MoleculeReplacer:
         Returns:
             List of replaced molecules (will have length of one in most cases)
         """
-        try:
-            return self.replacements[smiles]
-        except KeyError:
-            # If not found: return the original SMILES (as a list!)
+        # If not found: return the original SMILES (as a list!). Most molecules
+        # have no replacement, so avoid the cost of raising a KeyError for them.
+        replacement = self.replacements.get(smiles)
+        if replacement is None:
             return [smiles]
+        return replacement
 
     def replace_in_reaction_smiles(
         self, smiles: str, fragment_bond: Optional[str] = None
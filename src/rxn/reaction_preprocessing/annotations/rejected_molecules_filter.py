@@ -18,7 +18,7 @@ class RejectedMoleculesFilter:
         Args:
             rejected_molecules: Molecules to reject. Use dots for fragment bonds!
         """
-        self.rejected_molecules = set(rejected_molecules)
+        self.rejected_molecules = frozenset(rejected_molecules)
 
     def is_valid_molecule_smiles(self, smiles: str) -> bool:
         """
@@ -50,10 +50,7 @@ class RejectedMoleculesFilter:
         Args:
             reaction_equation: reaction equation instance.
         """
-        return all(
-            self.is_valid_molecule_smiles(smiles)
-            for smiles in reaction_equation.iter_all_smiles()
-        )
+        return self.rejected_molecules.isdisjoint(reaction_equation.iter_all_smiles())
 
     @classmethod
     def from_molecule_annotations(
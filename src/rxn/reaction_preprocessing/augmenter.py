@@ -83,21 +83,20 @@ class Augmenter:
         if not smiles:
             raise ValueError
 
+        # The molecules and fragments do not depend on the permutation
+        groups = [group.split(self.fragment_bond) for group in smiles.split(".")]
+
         list_of_smiles: List[str] = []
-        for i in range(permutations):
+        for _ in range(permutations):
             list_of_smiles.append(
                 ".".join(
-                    [
-                        self.fragment_bond.join(
-                            [
-                                Augmenter.__randomize_smiles_without_fragment(
-                                    fragment, random_type
-                                )
-                                for fragment in group.split(self.fragment_bond)
-                            ]
+                    self.fragment_bond.join(
+                        Augmenter.__randomize_smiles_without_fragment(
+                            fragment, random_type
                         )
-                        for group in smiles.split(".")
-                    ]
+                        for fragment in fragments
+                    )
+                    for fragments in groups
                 )
             )
         return list_of_smiles
@@ -198,25 +197,29 @@ class Augmenter:
             pd.DataFrame: A pandas Series containing the augmented samples.
         """
 
+        reactions = self.df[self.__reaction_column_name].str.replace(
+            " ", "", regex=False
+        )
+        has_arrow = reactions.str.contains(">>", regex=False, na=False)
+        if not has_arrow.all():
+            invalid_reaction = self.df[self.__reaction_column_name][~has_arrow].iloc[0]
+            raise ValueError(f'Invalid reaction SMILES (no ">>"): {invalid_reaction}')
+
+        # Split all the reactions at once instead of row by row
+        reaction_parts = reactions.str.split(">>", expand=True)
+        precursors, products = reaction_parts[0], reaction_parts[1]
+
         if rxn_section_to_augment is ReactionSection.precursors:
-            self.df[f"precursors_{random_type.name}"] = self.df[
-                self.__reaction_column_name
-            ].apply(lambda smiles: smiles.replace(" ", "").split(">>")[0])
-            if "products" not in self.df.keys():
-                self.df["products"] = self.df[self.__reaction_column_name].apply(
-                    lambda smiles: smiles.replace(" ", "").split(">>")[1]
-                )
+            self.df[f"precursors_{random_type.name}"] = precursors
+            if "products" not in self.df.columns:
+                self.df["products"] = products
             columns_to_augment = [f"precursors_{random_type.name}"]
             columns_to_join = [f"precursors_{random_type.name}", "products"]
 
         elif rxn_section_to_augment is ReactionSection.products:
-            self.df[f"products_{random_type.name}"] = self.df[
-                self.__reaction_column_name
-            ].apply(lambda smiles: smiles.replace(" ", "").split(">>")[1])
-            if "precursors" not in self.df.keys():
-                self.df["precursors"] = self.df[self.__reaction_column_name].apply(
-                    lambda smiles: smiles.replace(" ", "").split(">>")[0]
-                )
+            self.df[f"products_{random_type.name}"] = products
+            if "precursors" not in self.df.columns:
+                self.df["precursors"] = precursors
             columns_to_augment = [f"products_{random_type.name}"]
             columns_to_join = ["precursors", f"products_{random_type.name}"]
         else:
@@ -237,19 +240,21 @@ class Augmenter:
                 )
 
         # Exploding the dataframe columns where I have the list of augmented
-        # versions of a SMILES (the list length is the number of permutations)
-        self.df = (
-            self.df.set_index(
-                [col for col in self.df.keys() if col not in columns_to_augment]
-            )
-            .apply(pd.Series.explode)
-            .reset_index()
-        )
+        # versions of a SMILES (the list length is the number of permutations).
+        # The augmented column is moved to the end, where the previous
+        # set_index / reset_index approach put it.
+        (column_to_augment,) = columns_to_augment
+        self.df = self.df.explode(column_to_augment, ignore_index=True)
+        self.df = self.df[
+            [col for col in self.df.columns if col != column_to_augment]
+            + [column_to_augment]
+        ]
 
         augmented_column_name = f"rxn_{random_type.name}"
         self.augmented_columns.add(augmented_column_name)
-        self.df[augmented_column_name] = self.df.apply(
-            lambda x: ">>".join(x[columns_to_join]), axis=1
+        precursors_column, products_column = columns_to_join
+        self.df[augmented_column_name] = (
+            self.df[precursors_column] + ">>" + self.df[products_column]
         )
 
         return self.df
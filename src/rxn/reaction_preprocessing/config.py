@@ -3,6 +3,7 @@
 # IBM Research Zurich Licensed Internal Code
 # (C) Copyright IBM Corp. 2021
 # ALL RIGHTS RESERVED
+import functools
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from pathlib import Path
@@ -108,6 +109,8 @@ class RxnImportConfig:
             be added to the precursors of the corresponding reactions.
         keep_original_rxn_column: determines whether the original column with the
             raw reaction SMILES is to be kept or not.
+        num_workers: number of processes to use for the import. With more than
+            one, the rows are imported in parallel (in the same order).
     """
 
     input_file: str = SI("${data.path}")
@@ -120,6 +123,7 @@ class RxnImportConfig:
     column_for_light: Optional[str] = None
     column_for_heat: Optional[str] = None
     keep_original_rxn_column: bool = False
+    num_workers: int = 1
 
 
 @dataclass
@@ -295,11 +299,21 @@ class Config:
 
     @classmethod
     def from_generic_config(cls, config: Any) -> "Config":
-        cfg_dict = OmegaConf.merge(OmegaConf.structured(Config), config)
+        cfg_dict = OmegaConf.merge(_structured_config(), config)
         cfg = OmegaConf.to_object(cfg_dict)
         return cfg  # type: ignore
 
 
+@functools.lru_cache(maxsize=None)
+def _structured_config() -> Any:
+    """
+    Structured config for the Config schema, built only once.
+
+    Safe to share, as OmegaConf.merge does not modify its inputs.
+    """
+    return OmegaConf.structured(Config)
+
+
 cs = ConfigStore.instance()
 cs.store(group="data", name="base_data", node=DataConfig)
 cs.store(group="common", name="base_common", node=CommonConfig)
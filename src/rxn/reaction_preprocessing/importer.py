@@ -1,10 +1,26 @@
+import collections
+import functools
+import itertools
 import logging
-from typing import Callable, Optional, TextIO
-
+import multiprocessing
+from multiprocessing.pool import AsyncResult
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+import attr
 from rxn.chemutils.reaction_equation import ReactionEquation
 from rxn.chemutils.reaction_smiles import parse_any_reaction_smiles
 from rxn.chemutils.utils import remove_atom_mapping
-from rxn.utilities.csv import CsvIterator, StreamingCsvEditor
+from rxn.utilities.csv import CsvIterator
 from rxn.utilities.files import PathLike
 
 from rxn.reaction_preprocessing.config import InitialDataFormat, RxnImportConfig
@@ -13,6 +29,15 @@ from rxn.reaction_preprocessing.special_tokens import add_heat_token, add_light_
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+# Number of rows sent at once to a worker process when importing in parallel
+_ROWS_PER_CHUNK = 1000
+
+# Number of chunks per worker process that may be waiting to be written
+_PENDING_CHUNKS_PER_WORKER = 2
+
+# Buffer size for reading and writing the files (larger than the default of 8 KiB)
+_FILE_BUFFER_SIZE = 1 << 20
+
 
 class RxnImportError(ValueError):
     """Exception for errors in the initial data import."""
@@ -28,8 +53,11 @@ class InvalidColumn(RxnImportError):
         super().__init__(f'No column named "{column_name}" in the input file.')
 
 
+_TRUE_VALUES = frozenset(["yes", "true", "t", "1"])
+
+
 def _str2bool(v: str) -> bool:
-    return v.lower() in ("yes", "true", "t", "1")
+    return v.lower() in _TRUE_VALUES
 
 
 class RxnImporter:
@@ -43,6 +71,7 @@ class RxnImporter:
         column_for_light: Optional[str],
         column_for_heat: Optional[str],
         keep_original_rxn_column: bool,
+        num_workers: int = 1,
     ):
         self.data_format = data_format
         self.input_csv_column_name = input_csv_column_name
@@ -52,6 +81,27 @@ class RxnImporter:
         self.column_for_light = column_for_light
         self.column_for_heat = column_for_heat
         self.keep_original_rxn_column = keep_original_rxn_column
+        self.num_workers = num_workers
+        self._init_caches()
+
+    def _init_caches(self) -> None:
+        # Reaction data sets often contain the same reaction several times;
+        # cache the conversions to avoid parsing them repeatedly.
+        self._cached_reformat_smiles = functools.lru_cache(maxsize=100000)(
+            self._reformat_smiles
+        )
+        self._cached_add_tokens = functools.lru_cache(maxsize=100000)(self._add_tokens)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The caches cannot be pickled; each worker process builds its own.
+        state = self.__dict__.copy()
+        del state["_cached_reformat_smiles"]
+        del state["_cached_add_tokens"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_caches()
 
     def import_from_file(self, input_file: PathLike, output_csv: PathLike) -> None:
         """Function to import the reactions from one file and write them
@@ -60,10 +110,11 @@ class RxnImporter:
         Goes through all the steps involved in the import: parsing of the
         reaction SMILES, removal of the atom mapping, addition of special tokens.
         """
-        with open(input_file, "rt") as f_in, open(output_csv, "wt") as f_out:
-            csv_iterator = self._load_into_iterator(f_in)
-            csv_iterator = self.import_from_iterator(csv_iterator)
-            csv_iterator.to_stream(f_out)
+        with open(input_file, "rt", buffering=_FILE_BUFFER_SIZE) as f_in:
+            with open(output_csv, "wt", buffering=_FILE_BUFFER_SIZE) as f_out:
+                csv_iterator = self._load_into_iterator(f_in)
+                csv_iterator = self.import_from_iterator(csv_iterator)
+                csv_iterator.to_stream(f_out)
 
     def import_from_iterator(self, csv_iterator: CsvIterator) -> CsvIterator:
         """
@@ -76,17 +127,59 @@ class RxnImporter:
         Returns:
             CsvIterator with reactions after the import step.
         """
-        csv_iterator = self._handle_original_rxn_column(csv_iterator)
+        columns = list(csv_iterator.columns)
+        rxn_idx = csv_iterator.column_index(self.rxn_column)
 
-        csv_iterator = self._parse_reaction_smiles(csv_iterator)
+        # Column where to keep the original reaction SMILES, if required
+        original_idx: Optional[int] = None
+        if self.keep_original_rxn_column:
+            original_column = self._column_name_to_store_original_rxn()
+            if original_column not in columns:
+                columns.append(original_column)
+            original_idx = columns.index(original_column)
+        n_new_columns = len(columns) - len(csv_iterator.columns)
+
+        row_importer = _RowImporter(
+            importer=self,
+            rxn_idx=rxn_idx,
+            original_idx=original_idx,
+            n_new_columns=n_new_columns,
+            special_tokens=self._special_token_columns(columns),
+        )
 
-        # Add special tokens when necessary
-        csv_iterator = self._maybe_add_light_token(csv_iterator)
-        csv_iterator = self._maybe_add_heat_token(csv_iterator)
+        if self.num_workers > 1:
+            rows = self._import_rows_in_parallel(row_importer, csv_iterator.rows)
+        else:
+            imported_rows = (row_importer(row) for row in csv_iterator.rows)
+            rows = (row for row in imported_rows if row is not None)
 
-        csv_iterator = self._maybe_remove_atom_mapping(csv_iterator)
+        return CsvIterator(columns, rows)
 
-        return csv_iterator
+    def _import_rows_in_parallel(
+        self, row_importer: "_RowImporter", rows: Iterator[List[str]]
+    ) -> Iterator[List[str]]:
+        """
+        Import the rows with several processes, in chunks of rows.
+
+        The order of the rows is preserved.
+        """
+        chunks = iter(lambda: list(itertools.islice(rows, _ROWS_PER_CHUNK)), [])
+
+        # Pool.imap would read the whole input ahead of the workers; instead,
+        # only a few chunks per worker are submitted ahead of the output, so
+        # that the memory usage stays bounded for large files.
+        max_pending_chunks = _PENDING_CHUNKS_PER_WORKER * self.num_workers
+        pending: Deque["AsyncResult[List[List[str]]]"] = collections.deque()
+
+        with multiprocessing.Pool(
+            self.num_workers, initializer=_init_worker, initargs=(row_importer,)
+        ) as pool:
+            for chunk in chunks:
+                pending.append(pool.apply_async(_import_rows_in_worker, (chunk,)))
+                if len(pending) >= max_pending_chunks:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
 
     def _load_into_iterator(self, input_stream: TextIO) -> CsvIterator:
         """
@@ -139,35 +232,13 @@ class RxnImporter:
 
         return self.input_csv_column_name
 
-    def _handle_original_rxn_column(self, csv_iterator: CsvIterator) -> CsvIterator:
-        """Make sure that the original reaction SMILES is kept (if required)."""
-        if not self.keep_original_rxn_column:
-            return csv_iterator
-
-        # To keep the original column: we apply a fake transformation that
-        # just adds the column
-        def identity(v: str) -> str:
-            return v
-
-        editor = StreamingCsvEditor(
-            [self.rxn_column], [self._column_name_to_store_original_rxn()], identity
-        )
-        return editor.process(csv_iterator)
-
-    def _parse_reaction_smiles(self, csv_iterator: CsvIterator) -> CsvIterator:
-        editor = StreamingCsvEditor(
-            [self.rxn_column],
-            [self.rxn_column],
-            self._reformat_smiles,
-        )
-        csv_iterator = editor.process(csv_iterator)
-        return self._remove_invalid(csv_iterator)
-
     def _reformat_smiles(self, reaction_smiles: str) -> str:
         """Import a reaction SMILES in any format and convert it to an "IBM" RXN
         SMILES with the specified fragment bond.
 
         An empty string is returned if the reaction SMILES is not valid.
+
+        Note: use the cached version, _cached_reformat_smiles, for repeated calls.
         """
 
         try:
@@ -177,101 +248,131 @@ class RxnImporter:
             logger.info(f"Invalid reaction: {reaction_smiles}")
             return ""
 
-    def _remove_invalid(self, csv_iterator: CsvIterator) -> CsvIterator:
-        rxn_idx = csv_iterator.column_index(self.rxn_column)
+    def _special_token_columns(
+        self, columns: List[str]
+    ) -> List[Tuple[int, Callable[[ReactionEquation], ReactionEquation]]]:
+        """
+        Get the special tokens (light, heat) to consider for the import.
 
-        # Filter out the ones that have an empty SMILES string (note: is empty
-        # if the import was unsuccessful).
-        return CsvIterator(
-            csv_iterator.columns, (row for row in csv_iterator.rows if row[rxn_idx])
-        )
+        Args:
+            columns: columns of the CSV to import.
 
-    def _maybe_add_special_token(
-        self,
-        csv_iterator: CsvIterator,
-        add_special_token_fn: Callable[[ReactionEquation], ReactionEquation],
-        special_token_column: Optional[str],
-    ) -> CsvIterator:
+        Returns:
+            Tuples of the index of the column telling when to add a special
+            token, and the function to call on a ReactionEquation to add it.
         """
-        Common function for adding light or heat tokens.
+        special_tokens: List[
+            Tuple[Optional[str], Callable[[ReactionEquation], ReactionEquation]]
+        ] = [
+            (self.column_for_light, add_light_token),
+            (self.column_for_heat, add_heat_token),
+        ]
 
-        Args:
-            csv_iterator: iterator where to update the reaction SMILES.
-            add_special_token_fn: function to call on a ReactionEquation to add the required token.
-            special_token_column: column to look at in order to know when to add the special tokens.
+        special_token_columns = []
+        for column, add_special_token_fn in special_tokens:
+            # Do nothing if no column was specified for the special token
+            if column is None:
+                continue
+            if column not in columns:
+                raise InvalidColumn(column)
+            special_token_columns.append((columns.index(column), add_special_token_fn))
+        return special_token_columns
+
+    def _maybe_remove_atom_mapping(self, reaction_smiles: str) -> str:
+        """Remove the atom mapping if required by the config.
+
+        NB: This will not clean up the SMILES, i.e. "[CH3:1][CH3:2]" is converted
+        to "[CH3][CH3]" and not to "CC". The standardization step will do that.
         """
 
-        # Do nothing if no column was specified for the special token
-        if special_token_column is None:
-            return csv_iterator
+        # Atom maps always come with a ":"; no need to run the regex otherwise
+        if not self.remove_atom_maps or ":" not in reaction_smiles:
+            return reaction_smiles
 
-        if special_token_column not in csv_iterator.columns:
-            raise InvalidColumn(special_token_column)
+        return remove_atom_mapping(reaction_smiles)
 
-        # "partial" in order to make the function compatible with pandas.apply().
-        def fn(reaction_smiles: str, special_token: str) -> str:
-            return self._add_token(reaction_smiles, special_token, add_special_token_fn)
+    def _add_tokens(
+        self,
+        reaction_smiles: str,
+        add_special_token_fns: Tuple[
+            Callable[[ReactionEquation], ReactionEquation], ...
+        ],
+    ) -> str:
+        """Add special tokens (light, heat, etc.) to the reaction SMILES.
 
-        editor = StreamingCsvEditor(
-            [self.rxn_column, special_token_column],
-            [self.rxn_column],
-            fn,
-        )
-        return editor.process(csv_iterator)
+        The reaction SMILES is parsed only once, even for several tokens.
 
-    def _maybe_add_heat_token(self, csv_iterator: CsvIterator) -> CsvIterator:
-        """Add the heat token to the precursors of the reaction SMILES when necessary."""
+        Note: use the cached version, _cached_add_tokens, for repeated calls.
+        """
 
-        return self._maybe_add_special_token(
-            csv_iterator,
-            add_special_token_fn=add_heat_token,
-            special_token_column=self.column_for_heat,
-        )
+        reaction = parse_any_reaction_smiles(reaction_smiles)
+        for add_special_token_fn in add_special_token_fns:
+            reaction = add_special_token_fn(reaction)
 
-    def _maybe_add_light_token(self, csv_iterator: CsvIterator) -> CsvIterator:
-        """Add the light token to the precursors of the reaction SMILES when necessary."""
+        return reaction.to_string(self.fragment_bond)
 
-        return self._maybe_add_special_token(
-            csv_iterator,
-            add_special_token_fn=add_light_token,
-            special_token_column=self.column_for_light,
-        )
 
-    def _maybe_remove_atom_mapping(self, csv_iterator: CsvIterator) -> CsvIterator:
-        """Remove the atom mapping if required by the config.
+@attr.s(auto_attribs=True)
+class _RowImporter:
+    """
+    Apply all the import steps to one row of the CSV.
 
-        NB: This will not clean up the SMILES, i.e. "[CH3:1][CH3:2]" is converted
-        to "[CH3][CH3]" and not to "CC". The standardization step will do that.
+    Implemented as a class instead of a closure so that it can be sent to
+    worker processes.
+    """
+
+    importer: RxnImporter
+    rxn_idx: int
+    original_idx: Optional[int]
+    n_new_columns: int
+    special_tokens: List[Tuple[int, Callable[[ReactionEquation], ReactionEquation]]]
+
+    def __call__(self, row: List[str]) -> Optional[List[str]]:
         """
+        Returns:
+            The imported row, or None if the reaction SMILES is invalid.
+        """
+        row.extend("" for _ in range(self.n_new_columns))
+
+        reaction_smiles = row[self.rxn_idx]
+        if self.original_idx is not None:
+            row[self.original_idx] = reaction_smiles
 
-        if not self.remove_atom_maps:
-            return csv_iterator
+        reaction_smiles = self.importer._cached_reformat_smiles(reaction_smiles)
 
-        editor = StreamingCsvEditor(
-            [self.rxn_column],
-            [self.rxn_column],
-            remove_atom_mapping,
+        # Filter out the ones that have an empty SMILES string (note: is empty
+        # if the import was unsuccessful).
+        if not reaction_smiles:
+            return None
+
+        # Add special tokens when necessary
+        add_special_token_fns = tuple(
+            add_special_token_fn
+            for column_idx, add_special_token_fn in self.special_tokens
+            if _str2bool(row[column_idx])
         )
-        return editor.process(csv_iterator)
+        if add_special_token_fns:
+            reaction_smiles = self.importer._cached_add_tokens(
+                reaction_smiles, add_special_token_fns
+            )
 
-    def _add_token(
-        self,
-        reaction_smiles: str,
-        special_token: str,
-        add_special_token_fn: Callable[[ReactionEquation], ReactionEquation],
-    ) -> str:
-        """Function to use with StreamingCsvEditor to update the reaction SMILES."""
+        row[self.rxn_idx] = self.importer._maybe_remove_atom_mapping(reaction_smiles)
+        return row
 
-        special_flag_active = _str2bool(special_token)
 
-        if not special_flag_active:
-            # do nothing if the reaction is not run under light / heat / etc.
-            return reaction_smiles
+# Row importer of the current worker process, set by _init_worker.
+_worker_row_importer: Optional[_RowImporter] = None
 
-        reaction = parse_any_reaction_smiles(reaction_smiles)
-        reaction = add_special_token_fn(reaction)
 
-        return reaction.to_string(self.fragment_bond)
+def _init_worker(row_importer: _RowImporter) -> None:
+    global _worker_row_importer
+    _worker_row_importer = row_importer
+
+
+def _import_rows_in_worker(rows: List[List[str]]) -> List[List[str]]:
+    assert _worker_row_importer is not None
+    imported_rows = (_worker_row_importer(row) for row in rows)
+    return [row for row in imported_rows if row is not None]
 
 
 def rxn_import(cfg: RxnImportConfig) -> None:
@@ -287,6 +388,7 @@ def rxn_import(cfg: RxnImportConfig) -> None:
         column_for_light=cfg.column_for_light,
         column_for_heat=cfg.column_for_heat,
         keep_original_rxn_column=cfg.keep_original_rxn_column,
+        num_workers=cfg.num_workers,
     )
 
     importer.import_from_file(input_file=cfg.input_file, output_csv=cfg.output_csv)
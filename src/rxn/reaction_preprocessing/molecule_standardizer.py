@@ -1,3 +1,4 @@
+import functools
 from typing import List, Optional, Tuple
 
 from rxn.chemutils.conversion import canonicalize_smiles
@@ -17,6 +18,19 @@ from rxn.reaction_preprocessing.annotations.rejected_molecules_filter import (
 from rxn.reaction_preprocessing.cleaner import remove_isotope_information
 
 
+@functools.lru_cache(maxsize=100000)
+def _canonicalize_smiles(smiles: str) -> str:
+    """
+    Cached version of canonicalize_smiles.
+
+    The same molecules (solvents, common reagents, etc.) appear in a large
+    fraction of the reactions, and calling RDKit for each occurrence is
+    the main cost of the standardization. Invalid SMILES raise and are
+    therefore not cached.
+    """
+    return canonicalize_smiles(smiles)
+
+
 class MoleculeStandardizationError(ValueError):
     """Base class for standardization exceptions."""
 
@@ -111,7 +125,7 @@ class MoleculeStandardizer:
 
         # Check validity of SMILES (may raise InvalidSmiles), and
         # overwrite if canonicalization required
-        canonical_smiles = canonicalize_smiles(smiles)
+        canonical_smiles = _canonicalize_smiles(smiles)
         if self.canonicalize:
             smiles = canonical_smiles
 
@@ -16,6 +16,7 @@ from rxn.utilities.containers import iterate_unique_values
 from rxn.utilities.csv import CsvIterator, StreamingCsvEditor
 from rxn.utilities.files import PathLike
 from tabulate import tabulate
+from xxhash import xxh3_64_intdigest
 
 from .config import PreprocessConfig
 from .mixed_reaction_filter import MixedReactionFilter
@@ -150,9 +151,12 @@ class Preprocessor:
     def _remove_duplicate_reactions(self, csv_iterator: CsvIterator) -> CsvIterator:
         rxn_idx = csv_iterator.column_index(self.rxn_column)
 
-        # The key for determining what is a duplicate is the value from the rxn column
-        def key(row: List[str]) -> str:
-            return row[rxn_idx]
+        # The key for determining what is a duplicate is the value from the rxn
+        # column. We keep track of its 64-bit hash instead of the string itself,
+        # which keeps the set of seen reactions small for large data sets (the
+        # probability of a collision is negligible for realistic data sizes).
+        def key(row: List[str]) -> int:
+            return xxh3_64_intdigest(row[rxn_idx])  # type: ignore
 
         return CsvIterator(
             csv_iterator.columns, iterate_unique_values(csv_iterator.rows, key=key)
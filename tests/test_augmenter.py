@@ -119,3 +119,26 @@ def test_multiple_augmentation_rotated_on_products(augmenter: Augmenter) -> None
         "CC>>CC",
     ]
     assert new_df["rxn_rotated"].tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "rxn_section_to_augment", [ReactionSection.precursors, ReactionSection.products]
+)
+def test_raises_for_reaction_without_arrow(
+    rxn_section_to_augment: ReactionSection,
+) -> None:
+    augmenter = Augmenter(pd.DataFrame({"rxn": ["CC.O>>CCO", "CCO"]}), "rxn")
+
+    with pytest.raises(ValueError, match="CCO"):
+        augmenter.augment(
+            rrp.RandomType.rotated, rxn_section_to_augment=rxn_section_to_augment
+        )
+
+
+def test_products_for_reaction_with_several_arrows() -> None:
+    # Like str.split(">>")[1], the products are what comes after the first ">>"
+    augmenter = Augmenter(pd.DataFrame({"rxn": ["CC>>CO>>CN"]}), "rxn")
+
+    new_df = augmenter.augment(rrp.RandomType.molecules)
+
+    assert new_df["products"].tolist() == ["CO"]
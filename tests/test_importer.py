@@ -394,3 +394,49 @@ def test_remove_original_column_csv(input_file: str, output_file: str) -> None:
     # Verify that there is only the two required columns - no "smiles" anymore
     df = pd.read_csv(output_file)
     assert set(df.columns) == {"rxn", "dummy"}
+
+
+def test_import_with_several_workers(
+    input_file: str, output_file: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Small chunks, to make sure that the rows are spread over several workers
+    monkeypatch.setattr("rxn.reaction_preprocessing.importer._ROWS_PER_CHUNK", 2)
+
+    reactions = [
+        "CC>>CC",
+        "invalid",
+        "OO>>OO",
+        "[CH4:1].C.O>>[CH3:1]CO",
+        "CC>>CO>>CN",
+        "C.[Na+].[Cl-]>>C",
+        "C=C>>CC",
+    ]
+    has_light = [False, True, "yes", "no", True, False, True]
+    expected = [
+        "CC>>CC",
+        f"OO.{LIGHT_TOKEN}>>OO",
+        "[CH4].C.O>>[CH3]CO",
+        "C.[Na+].[Cl-]>>C",
+        f"C=C.{LIGHT_TOKEN}>>CC",
+    ]
+    pd.DataFrame({"smiles": reactions, "light": has_light}).to_csv(
+        input_file, index=False
+    )
+
+    cfg = RxnImportConfig(
+        input_file=input_file,
+        output_csv=output_file,
+        data_format=InitialDataFormat.CSV,
+        input_csv_column_name="smiles",
+        reaction_column_name="rxn",
+        fragment_bond=FragmentBond.TILDE,
+        column_for_light="light",
+        keep_original_rxn_column=True,
+        num_workers=2,
+    )
+    rxn_import(cfg)
+
+    # Verify the content
+    df = pd.read_csv(output_file)
+    assert df["rxn"].tolist() == expected
+    assert df["smiles"].tolist() == [reactions[i] for i in [0, 2, 3, 5, 6]]